@@ -4,17 +4,27 @@ Assignment 3 - CSV Data Analysis and Transformation Application
 """
 
 import csv
+import heapq
 import os
+import re
+from contextlib import suppress
 from datetime import datetime
+from functools import lru_cache
 from collections import defaultdict
+from operator import itemgetter
 
 # Constants
 VALID_DEPARTMENTS = {"Electronics", "Clothing", "Home", "Sports"}
-DATE_FORMAT = "%Y-%m-%d"
+DATE_RE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+AMOUNT_RE = re.compile(r"\+?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)")
+CURRENCY_TABLE = str.maketrans("", "", "$, ")
+FIELDNAMES = ["employee_id", "employee_name", "department", "sales_amount", "date"]
+DEPT_ERROR = f"department must be one of: {', '.join(VALID_DEPARTMENTS)}"
 
 OUTPUT_CLEANED = "cleaned_data.csv"
 OUTPUT_DEPT_SUMMARY = "department_summary.csv"
 ERROR_LOG = "errors.txt"
+IO_BUFFER_SIZE = 1 << 20  # 1 MiB, fewer read/write syscalls on large files
 
 
 def main():
@@ -29,22 +39,23 @@ def main():
         return
 
     print("\nLoading data...")
-    valid_records, invalid_count, total_processed = load_and_validate_data(filename)
+    totals, invalid_count, total_processed = load_and_validate_data(filename)
 
     if total_processed == 0:
         print("No records were processed. Check file and try again.")
         return
 
-    print(f"Valid records: {len(valid_records)}")
+    valid_count = total_processed - invalid_count
+    print(f"Valid records: {valid_count}")
     print(f"Invalid records: {invalid_count} (details in {ERROR_LOG})")
 
     print("\nCalculating statistics...")
-    stats = compute_statistics(valid_records)
+    stats = compute_statistics(totals)
 
-    display_report(stats, total_processed, invalid_count, len(valid_records))
+    display_report(stats, total_processed, invalid_count, valid_count)
 
+    # cleaned_data.csv was already written row by row while loading
     print("\nExporting results...")
-    export_cleaned(valid_records)
     export_department_summary(stats["departments"])
 
     print(f"  Cleaned data → {OUTPUT_CLEANED}")
@@ -56,132 +67,166 @@ def main():
 
 
 def load_and_validate_data(filename):
-    """Read CSV → validate & clean each row → return valid records + counts"""
-    valid = []
+    """Stream CSV → validate & clean each row → write valid rows to cleaned_data.csv
+    and return running totals + counts (only aggregates are kept in memory)"""
+    dept_total = defaultdict(float)
+    dept_count = defaultdict(int)
+    emp_total = defaultdict(float)
+    first_date = last_date = ""
+    valid_count = 0
     invalid_count = 0
-    total = 0
+    tmp_cleaned = OUTPUT_CLEANED + ".tmp"
 
-    # Clear error log
-    with open(ERROR_LOG, "w", encoding="utf-8") as f:
-        f.write("=== Sales Data Validation Errors ===\n\n")
-
-    if not os.path.isfile(filename):
-        print(f"Error: File '{filename}' not found.")
-        return [], 0, 0
-
-    try:
-        with open(filename, "r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames != ["employee_id", "employee_name", "department", "sales_amount", "date"]:
-                print("Warning: CSV headers do not exactly match expected format.")
-
-            for row_num, row in enumerate(reader, start=2):
-                total += 1
-                cleaned_row, error = clean_and_validate_row(row, row_num)
-                if cleaned_row:
-                    valid.append(cleaned_row)
-                else:
-                    invalid_count += 1
-                    log_error(row_num, error, row)
-
-        return valid, invalid_count, total
-
-    except PermissionError:
-        print(f"Permission denied: Cannot read '{filename}'")
-        return [], 0, 0
-    except csv.Error as e:
-        print(f"CSV parsing error: {e}")
-        return [], 0, 0
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return [], 0, 0
-
-
-def clean_and_validate_row(row, line):
-    """Validate one row → return cleaned dict or (None, error message)"""
-    try:
-        cleaned = {k: (v or "").strip() for k, v in row.items()}
+    with open(ERROR_LOG, "w", encoding="utf-8", buffering=IO_BUFFER_SIZE) as err_log:
+        err_log.write("=== Sales Data Validation Errors ===\n\n")
+        log_error = err_log.write
 
-        # employee_id
         try:
-            eid = int(cleaned["employee_id"])
-            if eid <= 0:
-                raise ValueError
-            cleaned["employee_id"] = str(eid)
-        except:
-            return None, "employee_id must be a positive integer"
-
-        # employee_name
-        if not cleaned["employee_name"]:
-            return None, "employee_name cannot be empty"
-
-        # department
-        dept = cleaned["department"].title()
+            with open(filename, "r", encoding="utf-8", newline="", buffering=IO_BUFFER_SIZE) as f:
+                reader = csv.reader(f)
+                header = next(reader, None) or []
+                if header != FIELDNAMES:
+                    missing = [name for name in FIELDNAMES if name not in header]
+                    if missing:
+                        print(f"Error: CSV is missing required column(s): {', '.join(missing)}")
+                        return {}, 0, 0
+                    print("Warning: CSV headers do not exactly match expected format; "
+                          "matching columns by name.")
+
+                # Pick the expected fields by header position, so column order doesn't matter
+                pick_fields = itemgetter(*[header.index(name) for name in FIELDNAMES])
+
+                with open(tmp_cleaned, "w", newline="", encoding="utf-8",
+                          buffering=IO_BUFFER_SIZE) as out:
+                    write_row = csv.writer(out).writerow
+                    write_row(FIELDNAMES)
+
+                    # filter(None, ...) skips blank lines, as DictReader did
+                    for row_num, row in enumerate(filter(None, reader), start=2):
+                        if len(row) != len(header):
+                            invalid_count += 1
+                            log_error(f"Line {row_num}: row has {len(row)} fields, "
+                                      f"expected {len(header)} → {row}\n")
+                            continue
+                        cleaned_row, error = clean_and_validate_row(*pick_fields(row), row_num)
+                        if not cleaned_row:
+                            invalid_count += 1
+                            log_error(f"Line {row_num}: {error} → {row}\n")
+                            continue
+
+                        eid, name, dept, amt, date = cleaned_row
+                        write_row((eid, name, dept, f"{amt:.2f}", date))
+                        valid_count += 1
+                        dept_total[dept] += amt
+                        dept_count[dept] += 1
+                        emp_total[name] += amt
+                        # ISO dates compare correctly as strings
+                        if not first_date or date < first_date:
+                            first_date = date
+                        if date > last_date:
+                            last_date = date
+
+            # Only replace the previous export once the whole file was read
+            if valid_count:
+                os.replace(tmp_cleaned, OUTPUT_CLEANED)
+
+            totals = {
+                "departments": dept_total,
+                "dept_counts": dept_count,
+                "employees": emp_total,
+                "first_date": first_date,
+                "last_date": last_date,
+            }
+            return totals, invalid_count, valid_count + invalid_count
+
+        except (FileNotFoundError, IsADirectoryError):
+            print(f"Error: File '{filename}' not found.")
+            return {}, 0, 0
+        except PermissionError:
+            print(f"Permission denied: Cannot read '{filename}'")
+            return {}, 0, 0
+        except csv.Error as e:
+            print(f"CSV parsing error: {e}")
+            return {}, 0, 0
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return {}, 0, 0
+        finally:
+            with suppress(FileNotFoundError):
+                os.remove(tmp_cleaned)
+
+
+def clean_and_validate_row(eid_str, name, dept, amt_str, date_str, line):
+    """Validate one row's fields → return cleaned tuple (FIELDNAMES order) or (None, error message)"""
+    # employee_id
+    eid_str = eid_str.strip().removeprefix("+")  # int() accepted one leading "+"
+    if not eid_str.isdecimal():
+        return None, "employee_id must be a positive integer"
+    try:
+        eid = int(eid_str)
+    except ValueError:  # e.g. more digits than int() allows
+        return None, "employee_id must be a positive integer"
+    if eid <= 0:
+        return None, "employee_id must be a positive integer"
+
+    # employee_name
+    name = name.strip()
+    if not name:
+        return None, "employee_name cannot be empty"
+
+    # department (most values already arrive canonical)
+    if dept not in VALID_DEPARTMENTS:
+        dept = _norm_dept(dept)
         if dept not in VALID_DEPARTMENTS:
-            return None, f"department must be one of: {', '.join(VALID_DEPARTMENTS)}"
-        cleaned["department"] = dept
-
-        # sales_amount
-        amt_str = cleaned["sales_amount"].replace("$", "").replace(",", "").strip()
-        try:
-            amt = float(amt_str)
-            if amt <= 0:
-                raise ValueError
-            cleaned["sales_amount"] = amt  # keep as float for calculations
-        except:
-            return None, "sales_amount must be a positive number"
-
-        # date
-        try:
-            dt = datetime.strptime(cleaned["date"], DATE_FORMAT)
-            cleaned["date"] = dt.strftime(DATE_FORMAT)
-        except:
-            return None, "date must be in YYYY-MM-DD format"
-
-        return cleaned, None
+            return None, DEPT_ERROR
+
+    # sales_amount
+    amt_str = amt_str.translate(CURRENCY_TABLE).strip()
+    if not AMOUNT_RE.fullmatch(amt_str):
+        return None, "sales_amount must be a positive number"
+    amt = float(amt_str)
+    if amt <= 0:
+        return None, "sales_amount must be a positive number"
+
+    # date (already canonical when it matches, so no strftime round trip)
+    date_str = date_str.strip()
+    m = DATE_RE.fullmatch(date_str)
+    if not m:
+        return None, "date must be in YYYY-MM-DD format"
+    try:
+        datetime(*map(int, m.groups()))  # rejects out-of-range days/months
+    except ValueError:
+        return None, "date must be in YYYY-MM-DD format"
 
-    except Exception as e:
-        return None, f"unexpected error: {str(e)}"
+    # sales_amount stays a float for calculations
+    return (str(eid), name, dept, amt, date_str), None
 
 
-def log_error(line, reason, original_row):
-    """Append error to errors.txt"""
-    with open(ERROR_LOG, "a", encoding="utf-8") as f:
-        f.write(f"Line {line}: {reason} → {original_row}\n")
+@lru_cache(maxsize=32)
+def _norm_dept(dept):
+    """Title-case a department name (few distinct values, so cache them)"""
+    return dept.strip().title()
 
 
-def compute_statistics(records):
-    """Calculate all required metrics"""
-    if not records:
+def compute_statistics(totals):
+    """Calculate all required metrics from the running totals"""
+    if not totals.get("departments"):
         return {}
 
-    total_sales = 0.0
-    dept_total = defaultdict(float)
-    dept_count = defaultdict(int)
-    emp_total = defaultdict(float)
-    dates = []
-
-    for r in records:
-        amt = r["sales_amount"]
-        total_sales += amt
-        dept = r["department"]
-        name = r["employee_name"]
-        dept_total[dept] += amt
-        dept_count[dept] += 1
-        emp_total[name] += amt
-        dates.append(r["date"])
-
-    avg_overall = total_sales / len(records) if records else 0
+    dept_total = totals["departments"]
+    dept_count = totals["dept_counts"]
+    total_sales = sum(dept_total.values())
+    avg_overall = total_sales / sum(dept_count.values())
 
-    top_emps = sorted(emp_total.items(), key=lambda x: x[1], reverse=True)[:3]
+    top_emps = heapq.nlargest(3, totals["employees"].items(), key=itemgetter(1))
 
     return {
         "total_sales": total_sales,
         "avg_sale": avg_overall,
-        "departments": dict(dept_total),
-        "dept_counts": dict(dept_count),
+        "departments": dept_total,
+        "dept_counts": dept_count,
         "top_employees": top_emps,
-        "date_range": f"{min(dates)} to {max(dates)}" if dates else "N/A"
+        "date_range": f"{totals['first_date']} to {totals['last_date']}"
     }
 
 
@@ -212,22 +257,6 @@ def display_report(stats, total_processed, invalid, valid_count):
     print("=" * 40)
 
 
-def export_cleaned(records):
-    """Write cleaned valid data to CSV"""
-    if not records:
-        return
-
-    fieldnames = ["employee_id", "employee_name", "department", "sales_amount", "date"]
-
-    with open(OUTPUT_CLEANED, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in records:
-            row = r.copy()
-            row["sales_amount"] = f"{r['sales_amount']:.2f}"
-            writer.writerow(row)
-
-
 def export_department_summary(dept_totals):
     """Write department summary CSV (sorted by total descending)"""
     rows = []
@@ -236,7 +265,7 @@ def export_department_summary(dept_totals):
 
     rows.sort(key=lambda x: x["total_sales"], reverse=True)
 
-    with open(OUTPUT_DEPT_SUMMARY, "w", newline="", encoding="utf-8") as f:
+    with open(OUTPUT_DEPT_SUMMARY, "w", newline="", encoding="utf-8", buffering=IO_BUFFER_SIZE) as f:
         writer = csv.DictWriter(f, fieldnames=["department", "total_sales"])
         writer.writeheader()
         for row in rows: